@@ -1,11 +1,31 @@
-from collections import UserDict
-from typing import List
-from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from datetime import date, datetime, timedelta
+from calendar import isleap
+import json
+import os
 import pickle
+import re
+import sys
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from bisect import bisect_left, bisect_right
+from array import array
+from functools import lru_cache
+from types import SimpleNamespace
+
+try:
+    import readline
+except ImportError:
+    readline = None
+
+PHONE_PATTERN = re.compile(r"[0-9]{10}\Z")
+RESPONSE_CACHE_SIZE = 256
+LEGACY_CLASS_NAMES = {"AddressBook", "Record", "Field", "Name", "Phone", "Birthday"}
 
 
 class Field:
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value = value
 
@@ -20,109 +40,358 @@ class Field:
 
 
 class Name(Field):
-    pass
+    __slots__ = ()
+
+    def __str__(self):
+        return self.value
 
 
 class Phone(Field):
+    __slots__ = ()
+
+    def __str__(self):
+        return self.value
+
     def is_valid(self):
-        return len(self.value) == 10 and self.value.isdigit()
+        return PHONE_PATTERN.match(self.value) is not None
+
+
+@lru_cache(maxsize=4096)
+def parse_birthday(value: str):
+    return datetime.strptime(value, "%d.%m.%Y").date()
+
+
+def birthday_key(month: int, day: int):
+    return (month << 5) | day
+
+
+LEAP_DAY_KEY = birthday_key(2, 29)
+MARCH_FIRST_KEY = birthday_key(3, 1)
 
 
 class Birthday(Field):
+    __slots__ = ("month", "day", "_str")
+
     def __init__(self, value: str):
         try:
-            super().__init__(datetime.strptime(value, "%d.%m.%Y").date())
+            super().__init__(parse_birthday(value))
         except ValueError:
             raise ValueError("Invalid date format. Use DD.MM.YYYY")
 
+        self.month = self.value.month
+        self.day = self.value.day
+        self._str = self.value.strftime("%d.%m.%Y")
+
+    def __str__(self):
+        return self._str
+
 
 class Record:
+    __slots__ = ("name", "phones", "birthday", "_phone_index", "_books")
+
     def __init__(self, name: str):
         self.name = Name(name)
         self.phones: List[Phone] = []
+        self._phone_index: Dict[str, Phone] = {}
         self.birthday: Birthday | None = None
+        self._books: List[Tuple["AddressBook", str]] = []
 
-    def __str__(self):
-        return (f"Contact name: {self.name}, phones: {"; ".join(list(map(lambda phone: str(phone), self.phones)))}, "
-                f"birthday: {self.birthday}")
+    def __getstate__(self):
+        return {"name": self.name, "phones": self.phones, "birthday": self.birthday, "_phone_index": self._phone_index}
+
+    def __setstate__(self, state):
+        for attribute, value in state.items():
+            setattr(self, attribute, value)
 
-    def __find_phone_index__(self, phone_str):
-        phone_index = None
+        self._books = []
 
-        for i in range(len(self.phones)):
-            if self.phones[i].value == phone_str:
-                phone_index = i
+    def __str__(self):
+        phones = "; ".join(phone.value for phone in self.phones)
+        birthday = str(self.birthday) if self.birthday else None
 
-        return phone_index
+        return f"Contact name: {self.name.value}, phones: {phones}, birthday: {birthday}"
 
     def add_phone(self, phone: str):
-        self.phones.append(Phone(phone))
+        if phone in self._phone_index:
+            return
+
+        new_phone = Phone(phone)
+        self._phone_index[phone] = new_phone
+        self.phones.append(new_phone)
+        self._changed()
 
     def remove_phone(self, phone: str):
-        phone_index = self.__find_phone_index__(phone)
+        found_phone = self._phone_index.pop(phone, None)
 
-        if phone_index is None:
+        if found_phone is None:
             raise ValueError
-        else:
-            del self.phones[phone_index]
+
+        self.phones.remove(found_phone)
+        self._changed()
 
     def edit_phone(self, old_phone: str, new_phone: str):
-        phone_index = self.__find_phone_index__(old_phone)
+        found_phone = self._phone_index.get(old_phone)
 
-        if phone_index is None:
+        if found_phone is None:
             raise ValueError
-        else:
-            self.phones[phone_index] = Phone(new_phone)
+
+        if new_phone != old_phone and new_phone in self._phone_index:
+            self.remove_phone(old_phone)
+            return
+
+        edited_phone = Phone(new_phone)
+        del self._phone_index[old_phone]
+        self._phone_index[new_phone] = edited_phone
+        self.phones[self.phones.index(found_phone)] = edited_phone
+        self._changed()
 
     def find_phone(self, phone: str):
-        phone_index = self.__find_phone_index__(phone)
+        found_phone = self._phone_index.get(phone)
 
-        if phone_index is None:
+        if found_phone is None:
             raise ValueError
-        else:
-            return self.phones[phone_index]
+
+        return found_phone
 
     def add_birthday(self, birthday: str):
         self.birthday = Birthday(birthday)
+        self._changed()
+
+    def _changed(self):
+        for book, name in self._books:
+            book._record_changed(name, self)
+
+    def _detach(self, book: "AddressBook", name: str):
+        self._books = [(owner, key) for owner, key in self._books if owner is not book or key != name]
+
+
+class LegacyBookUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        if name in LEGACY_CLASS_NAMES:
+            return SimpleNamespace
+
+        if (module, name) == ("datetime", "date"):
+            return date
+
+        raise pickle.UnpicklingError(f"{module}.{name} is not allowed in an address book file")
+
+
+class AddressBook(dict[str, Record]):
+    """Contacts keyed by name, with a sorted birthday index.
+
+    Item assignment and deletion, add_record, delete, pop, popitem, clear,
+    update, setdefault, |, |= and copy keep the index in sync. fromkeys is
+    not supported.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._birthday_keys = array("H")
+        self._birthday_names: List[str] = []
+        self._birthday_key_by_name: Dict[str, int] = {}
+        self.generation = 0
+        super().__init__()
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, name: str, record: Record):
+        old_record = self.get(name)
+
+        if old_record is not None:
+            old_record._detach(self, name)
+
+        super().__setitem__(name, record)
+        record._books.append((self, name))
+        self._record_changed(name, record)
+
+    def __delitem__(self, name: str):
+        record = self[name]
+        super().__delitem__(name)
+        record._detach(self, name)
+        self.generation += 1
+        self._unindex_birthday(name)
+
+    def __reduce__(self):
+        return self.__class__, (), None, None, iter(self.items())
+
+    def __or__(self, other):
+        if not isinstance(other, dict):
+            return NotImplemented
+
+        book = self.copy()
+        book.update(other)
+
+        return book
+
+    def __ior__(self, other):
+        self.update(other)
+
+        return self
+
+    @classmethod
+    def fromkeys(cls, iterable, value=None):
+        raise TypeError("AddressBook.fromkeys is not supported, use add_record")
+
+    def copy(self):
+        book = self.__class__()
+        book.update(self)
+
+        return book
+
+    def pop(self, name: str, *default):
+        if name not in self:
+            if default:
+                return default[0]
+
+            raise KeyError(name)
 
+        record = self[name]
+        del self[name]
+
+        return record
+
+    def popitem(self):
+        if not self:
+            raise KeyError("popitem(): dictionary is empty")
+
+        name = next(reversed(self))
+
+        return name, self.pop(name)
+
+    def clear(self):
+        for name, record in self.items():
+            record._detach(self, name)
+
+        super().clear()
+        self._birthday_keys = array("H")
+        self._birthday_names.clear()
+        self._birthday_key_by_name.clear()
+        self.generation += 1
+
+    def setdefault(self, name: str, record: Record):
+        if name not in self:
+            self[name] = record
+
+        return self[name]
+
+    def update(self, *args, **kwargs):
+        for name, record in dict(*args, **kwargs).items():
+            self[name] = record
 
-class AddressBook(UserDict[str, Record]):
     def __str__(self):
-        return "\n".join(map(str, self.data.values()))
+        return "\n".join(map(str, self.values()))
+
+    def to_dict(self):
+        return {
+            name: {
+                "phones": [phone.value for phone in record.phones],
+                "birthday": str(record.birthday) if record.birthday else None,
+            }
+            for name, record in self.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        book = cls()
+
+        for name, fields in data.items():
+            record = Record(name)
+
+            for phone in fields["phones"]:
+                record.add_phone(phone)
+
+            if fields["birthday"]:
+                record.add_birthday(fields["birthday"])
+
+            book.add_record(record)
+
+        return book
+
+    @classmethod
+    def from_legacy_pickle(cls, file):
+        legacy_book = LegacyBookUnpickler(file).load()
+
+        return cls.from_dict({
+            name: {
+                "phones": [phone.value for phone in record.phones],
+                "birthday": record.birthday.value.strftime("%d.%m.%Y") if record.birthday else None,
+            }
+            for name, record in legacy_book.data.items()
+        })
+
+    def _birthday_position(self, key: int, name: str):
+        lo = bisect_left(self._birthday_keys, key)
+        hi = bisect_right(self._birthday_keys, key, lo)
+
+        return bisect_left(self._birthday_names, name, lo, hi)
+
+    def _record_changed(self, name: str, record: Record):
+        self.generation += 1
+        self._unindex_birthday(name)
+
+        if record.birthday:
+            key = birthday_key(record.birthday.month, record.birthday.day)
+            position = self._birthday_position(key, name)
+            self._birthday_key_by_name[name] = key
+            self._birthday_keys.insert(position, key)
+            self._birthday_names.insert(position, name)
+
+    def _unindex_birthday(self, name: str):
+        key = self._birthday_key_by_name.pop(name, None)
+
+        if key is not None:
+            position = self._birthday_position(key, name)
+            del self._birthday_keys[position]
+            del self._birthday_names[position]
 
     def add_record(self, record: Record):
-        self.data[record.name.value] = record
+        self[sys.intern(record.name.value)] = record
 
     def find(self, name: str):
-        if name in self.data.keys():
-            return self.data[name]
-        else:
-            return None
+        return self.get(name)
 
     def delete(self, name: str):
-        if name in self.data.keys():
-            del self.data[name]
+        try:
+            del self[name]
+        except KeyError:
+            pass
+
+    def get_upcoming_birthdays(self, days: int = 7):
+        date_today = date.today()
+        date_end = date_today + timedelta(days=days)
+        congratulation_dates: Dict[int, str] = {}
+
+        for offset in range(days + 1):
+            day = date_today + timedelta(days=offset)
+            day_key = birthday_key(day.month, day.day)
+            weekday = day.weekday()
+            congratulation_date = day
 
-    def get_upcoming_birthdays(self):
-        upcoming_birthdays = []
-        date_today = datetime.today().date()
-        date_today_plus_week = date_today + timedelta(days=7)
+            if weekday >= 5:
+                congratulation_date = day + timedelta(days=7 - weekday)
 
-        for record in self.data.values():
-            birthday = record.birthday.value.replace(year=date_today.year)
+            congratulation_dates[day_key] = congratulation_date.strftime("%d.%m.%Y")
 
-            if date_today.timetuple().tm_yday <= birthday.timetuple().tm_yday <= date_today_plus_week.timetuple().tm_yday:
-                birthday_day_of_week = birthday.timetuple().tm_wday
-                congratulation_date = birthday
+            if day_key == MARCH_FIRST_KEY and not isleap(day.year):
+                congratulation_dates[LEAP_DAY_KEY] = congratulation_dates[day_key]
 
-                if birthday_day_of_week == 5 or birthday_day_of_week == 6:
-                    next_monday = birthday + timedelta(days=7 - birthday.timetuple().tm_wday)
-                    congratulation_date = next_monday
+        start_key = birthday_key(date_today.month, date_today.day)
+        end_key = birthday_key(date_end.month, date_end.day)
 
-                upcoming_birthdays.append(
-                    {"name": record.name.value, "congratulation_date": congratulation_date.strftime("%d.%m.%Y")})
+        if start_key == MARCH_FIRST_KEY and not isleap(date_today.year):
+            start_key = LEAP_DAY_KEY
 
-        return upcoming_birthdays
+        start = bisect_left(self._birthday_keys, start_key)
+        end = bisect_right(self._birthday_keys, end_key)
+
+        if start_key <= end_key:
+            ranges = [(start, end)]
+        else:
+            ranges = [(start, len(self._birthday_keys)), (0, end)]
+
+        return [
+            {"name": self._birthday_names[i], "congratulation_date": congratulation_dates[self._birthday_keys[i]]}
+            for lo, hi in ranges
+            for i in range(lo, hi)
+        ]
 
 
 def input_error(func):
@@ -140,19 +409,47 @@ def input_error(func):
 
 
 def parse_input(user_input: str):
-    cmd, *args = user_input.split()
-    cmd = cmd.strip().lower()
+    cmd, *rest = user_input.split(maxsplit=1) or ("",)
 
-    return cmd, *args
+    return cmd.lower(), *(rest[0].split() if rest else ())
 
 
 class ChatBot(ABC):
-    def __init__(self, filename="addressbook.pkl"):
+    def __init__(self, filename="addressbook.json", legacy_filename="addressbook.pkl"):
+        self._book_filename = filename
+        self._legacy_filename = legacy_filename
+        self._book: AddressBook | None = None
+        self._book_unreadable = False
+
+    @property
+    def book(self):
+        if self._book is None:
+            try:
+                with open(self._book_filename, "r", encoding="utf-8") as file:
+                    self._book = AddressBook.from_dict(json.load(file))
+            except FileNotFoundError:
+                self._book = self._import_legacy_book()
+            except (ValueError, KeyError, TypeError, AttributeError):
+                print(f"Warning: could not read contacts from {self._book_filename}, changes will not be saved to it.")
+                self._book_unreadable = True
+                self._book = AddressBook()
+
+        return self._book
+
+    def _import_legacy_book(self):
         try:
-            with open(filename, "rb") as file:
-                self.book = pickle.load(file)
+            with open(self._legacy_filename, "rb") as file:
+                book = AddressBook.from_legacy_pickle(file)
         except FileNotFoundError:
-            self.book = AddressBook()
+            return AddressBook()
+        except (pickle.UnpicklingError, AttributeError, EOFError, ValueError):
+            print(f"Warning: could not import contacts from {self._legacy_filename}, starting with an empty book.")
+            return AddressBook()
+
+        self._write_book(book, self._book_filename)
+        print(f"Imported contacts from {self._legacy_filename} into {self._book_filename}.")
+
+        return book
 
     @abstractmethod
     def get_greeting(self):
@@ -195,12 +492,50 @@ class ChatBot(ABC):
     def get_good_bye(self):
         pass
 
-    def save_data(self, filename="addressbook.pkl"):
-        with open(filename, "wb") as file:
-            pickle.dump(self.book, file)
+    def save_data(self, filename: str | None = None):
+        if filename is None:
+            filename = self._book_filename
+
+        if (self._book is None or self._book_unreadable) and filename == self._book_filename:
+            return
+
+        self._write_book(self.book, filename)
+
+    @staticmethod
+    def _write_book(book: AddressBook, filename: str):
+        tmp_filename = filename + ".tmp"
+
+        with open(tmp_filename, "w", encoding="utf-8") as file:
+            json.dump(book.to_dict(), file, ensure_ascii=False)
+
+        os.replace(tmp_filename, filename)
 
 
 class SimpleChatBot(ChatBot):
+    def __init__(self, filename="addressbook.json", legacy_filename="addressbook.pkl"):
+        super().__init__(filename, legacy_filename)
+        self._responses: OrderedDict[Tuple[str, str], str] = OrderedDict()
+        self._responses_generation = None
+
+    def _cached_response(self, command: str, name: str, build):
+        if self._responses_generation != self.book.generation:
+            self._responses.clear()
+            self._responses_generation = self.book.generation
+
+        key = (command, name)
+
+        if key in self._responses:
+            self._responses.move_to_end(key)
+
+            return self._responses[key]
+
+        response = self._responses[key] = build(name)
+
+        if len(self._responses) > RESPONSE_CACHE_SIZE:
+            self._responses.popitem(last=False)
+
+        return response
+
     def get_greeting(self):
         return "How can I help you?"
 
@@ -228,16 +563,18 @@ class SimpleChatBot(ChatBot):
         return "Contact updated."
 
     def get_phones(self, args: List[str]):
-        name = args[0]
+        return self._cached_response("phone", args[0], self._format_phones)
+
+    def _format_phones(self, name: str):
         record = self.book.find(name)
 
         if not record:
             return f"{name} doesn't exist."
 
-        return record.phones
+        return "; ".join(phone.value for phone in record.phones)
 
     def get_all_contacts(self):
-        if len(self.book.data) == 0:
+        if len(self.book) == 0:
             return "Contacts list is empty."
 
         return self.book
@@ -255,7 +592,9 @@ class SimpleChatBot(ChatBot):
         return "Birthday added."
 
     def show_birthday(self, args):
-        name = args[0]
+        return self._cached_response("show-birthday", args[0], self._format_birthday)
+
+    def _format_birthday(self, name: str):
         record = self.book.find(name)
 
         if not record:
@@ -264,10 +603,10 @@ class SimpleChatBot(ChatBot):
         if not record.birthday:
             return f"{name} doesn't have birthday."
 
-        return record.birthday
+        return str(record.birthday)
 
     def birthdays(self):
-        if not self.book.data:
+        if not self.book:
             return "Contacts list is empty."
 
         return self.book.get_upcoming_birthdays()
@@ -305,30 +644,47 @@ class AdvancedChatBot(ChatBot):
         return "Hello from advanced bot. How can I help you?"
 
 
+def setup_completion(chat_bot: ChatBot, commands: List[str]):
+    if readline is None:
+        return
+
+    def complete(text: str, state: int):
+        if readline.get_line_buffer()[:readline.get_begidx()].strip():
+            options = chat_bot.book.keys()
+        else:
+            options = commands
+
+        matches = [option for option in options if option.startswith(text)]
+
+        return matches[state] if state < len(matches) else None
+
+    readline.set_completer(complete)
+    readline.set_completer_delims(" ")
+    readline.parse_and_bind("tab: complete")
+
+
 def main():
     chat_bot = SimpleChatBot()
+    handlers = {
+        "hello": lambda args: chat_bot.get_greeting(),
+        "add": chat_bot.add_contact,
+        "change": chat_bot.change_phone,
+        "phone": chat_bot.get_phones,
+        "add-birthday": chat_bot.add_birthday,
+        "show-birthday": chat_bot.show_birthday,
+        "birthdays": lambda args: chat_bot.birthdays(),
+        "all": lambda args: chat_bot.get_all_contacts(),
+    }
+    setup_completion(chat_bot, [*handlers, "close", "exit"])
     print("Welcome to the assistant bot!")
 
     while True:
         user_input = input("Enter a command: ")
         cmd, *args = parse_input(user_input)
+        handler = handlers.get(cmd)
 
-        if cmd == "hello":
-            print(chat_bot.get_greeting())
-        elif cmd == "add":
-            print(chat_bot.add_contact(args))
-        elif cmd == "change":
-            print(chat_bot.change_phone(args))
-        elif cmd == "phone":
-            print(chat_bot.get_phones(args))
-        elif cmd == "add-birthday":
-            print(chat_bot.add_birthday(args))
-        elif cmd == "show-birthday":
-            print(chat_bot.show_birthday(args))
-        elif cmd == "birthdays":
-            print(chat_bot.birthdays())
-        elif cmd == "all":
-            print(chat_bot.get_all_contacts())
+        if handler:
+            print(handler(args))
         elif cmd == "close" or cmd == "exit":
             print(chat_bot.get_good_bye())
             chat_bot.save_data()
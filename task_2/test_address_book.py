@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+import test as bot
+
+
+class FixedDate(date):
+    @classmethod
+    def today(cls):
+        return cls(2026, 5, 4)
+
+
+@mock.patch.object(bot, "date", FixedDate)
+class AddressBookBirthdayIndexTest(unittest.TestCase):
+    def upcoming_names(self, book):
+        return [birthday["name"] for birthday in book.get_upcoming_birthdays()]
+
+    def test_birthday_set_after_add_record(self):
+        book = bot.AddressBook()
+        record = bot.Record("John")
+        book.add_record(record)
+
+        record.add_birthday("05.05.1990")
+
+        self.assertEqual(self.upcoming_names(book), ["John"])
+
+    def test_birthday_changed_after_add_record(self):
+        book = bot.AddressBook()
+        record = bot.Record("John")
+        record.add_birthday("05.05.1990")
+        book.add_record(record)
+
+        record.add_birthday("01.01.1990")
+
+        self.assertEqual(self.upcoming_names(book), [])
+
+    def test_deleted_record_is_no_longer_tracked(self):
+        book = bot.AddressBook()
+        record = bot.Record("John")
+        book.add_record(record)
+        book.delete("John")
+
+        record.add_birthday("05.05.1990")
+
+        self.assertEqual(self.upcoming_names(book), [])
+
+
+class SimpleChatBotResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.chat_bot = bot.SimpleChatBot(filename="missing.json", legacy_filename="missing.pkl")
+        self.chat_bot.add_contact(["John", "1111111111"])
+        self.chat_bot.get_phones(["John"])
+
+    def test_add_phone_on_found_record(self):
+        self.chat_bot.book.find("John").add_phone("2222222222")
+
+        self.assertEqual(self.chat_bot.get_phones(["John"]), "1111111111; 2222222222")
+
+    def test_edit_phone_on_found_record(self):
+        self.chat_bot.book.find("John").edit_phone("1111111111", "3333333333")
+
+        self.assertEqual(self.chat_bot.get_phones(["John"]), "3333333333")
+
+
+class ChatBotStorageTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.filename = os.path.join(directory.name, "addressbook.json")
+        self.legacy_filename = os.path.join(directory.name, "addressbook.pkl")
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(directory.name)
+
+    def assert_unreadable_file_is_kept(self, content):
+        with open(self.filename, "w", encoding="utf-8") as file:
+            file.write(content)
+
+        chat_bot = bot.SimpleChatBot(filename=self.filename, legacy_filename=self.legacy_filename)
+
+        with mock.patch("builtins.print") as mocked_print:
+            self.assertEqual(chat_bot.get_all_contacts(), "Contacts list is empty.")
+
+        self.assertIn(self.filename, mocked_print.call_args.args[0])
+        chat_bot.add_contact(["John", "1111111111"])
+        chat_bot.save_data(self.filename)
+
+        with open(self.filename, encoding="utf-8") as file:
+            self.assertEqual(file.read(), content)
+
+    def test_save_data_defaults_to_own_file(self):
+        filename = os.path.join(os.path.dirname(self.filename), "contacts.json")
+        chat_bot = bot.SimpleChatBot(filename=filename, legacy_filename=self.legacy_filename)
+        chat_bot.add_contact(["John", "1111111111"])
+
+        chat_bot.save_data()
+
+        self.assertTrue(os.path.exists(filename))
+        self.assertFalse(os.path.exists("addressbook.json"))
+
+    def test_save_data_skips_unloaded_book(self):
+        chat_bot = bot.SimpleChatBot(filename=self.filename, legacy_filename=self.legacy_filename)
+
+        chat_bot.save_data()
+
+        self.assertFalse(os.path.exists(self.filename))
+
+    def test_malformed_json(self):
+        self.assert_unreadable_file_is_kept("{not json")
+
+    def test_invalid_phone(self):
+        self.assert_unreadable_file_is_kept('{"John": {"phones": ["12"], "birthday": null}}')
+
+
+if __name__ == "__main__":
+    unittest.main()